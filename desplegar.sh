@@ -70,6 +70,7 @@ DATASET_CLIMA="clima"
 TABLA_CONDICIONES="condiciones_actuales"
 FUNCION_EXTRACTOR="extractor-clima"
 FUNCION_PROCESADOR="procesador-clima"
+CONCURRENCIA_PROCESADOR=16
 JOB_SCHEDULER="extraer-clima-job"
 CUENTA_SERVICIO="funciones-clima-sa"
 
@@ -330,6 +331,28 @@ else
 fi
 rm /tmp/schema_clima.json
 
+# Desplegar Cloud Function Procesador antes que el extractor: el extractor
+# publica en MessagePack y el procesador debe poder decodificarlo primero
+imprimir_titulo "Desplegando Cloud Function: Procesador"
+gcloud functions deploy $FUNCION_PROCESADOR \
+    --gen2 \
+    --runtime=python311 \
+    --region=$REGION \
+    --source=./procesador \
+    --entry-point=procesar_clima \
+    --trigger-topic=$TOPIC_DATOS_CRUDOS \
+    --service-account=${CUENTA_SERVICIO}@${ID_PROYECTO}.iam.gserviceaccount.com \
+    --set-env-vars=GCP_PROJECT=$ID_PROYECTO,BUCKET_CLIMA=$BUCKET_COMPLETO,DATASET_CLIMA=$DATASET_CLIMA,TABLA_CLIMA=$TABLA_CONDICIONES,MENSAJES_CONCURRENTES=$CONCURRENCIA_PROCESADOR \
+    --memory=512MB \
+    --cpu=1 \
+    --concurrency=$CONCURRENCIA_PROCESADOR \
+    --timeout=120s \
+    --max-instances=10 \
+    --project=$ID_PROYECTO \
+    --quiet
+
+imprimir_exito "Cloud Function desplegada: $FUNCION_PROCESADOR"
+
 # Desplegar Cloud Function Extractor
 imprimir_titulo "Desplegando Cloud Function: Extractor"
 gcloud functions deploy $FUNCION_EXTRACTOR \
@@ -341,7 +364,9 @@ gcloud functions deploy $FUNCION_EXTRACTOR \
     --trigger-http \
     --service-account=${CUENTA_SERVICIO}@${ID_PROYECTO}.iam.gserviceaccount.com \
     --set-env-vars=GCP_PROJECT=$ID_PROYECTO \
-    --memory=256MB \
+    --memory=512MB \
+    --cpu=1 \
+    --concurrency=8 \
     --timeout=60s \
     --max-instances=10 \
     --project=$ID_PROYECTO \
@@ -371,25 +396,6 @@ gcloud run services add-iam-policy-binding $FUNCION_EXTRACTOR \
 
 imprimir_exito "Permisos de invocación configurados para Cloud Scheduler"
 
-# Desplegar Cloud Function Procesador
-imprimir_titulo "Desplegando Cloud Function: Procesador"
-gcloud functions deploy $FUNCION_PROCESADOR \
-    --gen2 \
-    --runtime=python311 \
-    --region=$REGION \
-    --source=./procesador \
-    --entry-point=procesar_clima \
-    --trigger-topic=$TOPIC_DATOS_CRUDOS \
-    --service-account=${CUENTA_SERVICIO}@${ID_PROYECTO}.iam.gserviceaccount.com \
-    --set-env-vars=GCP_PROJECT=$ID_PROYECTO,BUCKET_CLIMA=$BUCKET_COMPLETO,DATASET_CLIMA=$DATASET_CLIMA,TABLA_CLIMA=$TABLA_CONDICIONES \
-    --memory=512MB \
-    --timeout=120s \
-    --max-instances=10 \
-    --project=$ID_PROYECTO \
-    --quiet
-
-imprimir_exito "Cloud Function desplegada: $FUNCION_PROCESADOR"
-
 # Crear job de Cloud Scheduler
 imprimir_titulo "Creando job de Cloud Scheduler"
 
@@ -10,15 +10,26 @@ Arquitectura: Cloud Scheduler → Cloud Function (Extractor) → Pub/Sub Topic
 import json
 import logging
 import os
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Tuple
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 
 import functions_framework
-import requests
+import httpx
+import msgpack
 from google.cloud import pubsub_v1
-from google.cloud import secretmanager
 from flask import Request
 
+# orjson (serialización en Rust) es opcional: si no está instalado se usa
+# la librería estándar json con el mismo resultado funcional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Configuración de logging estructurado
 logging.basicConfig(
@@ -27,34 +38,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# httpx registra cada solicitud en INFO con la URL completa; se limita a
+# advertencias para no repetir una línea por ubicación en cada invocación
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+# Logger del resumen por invocación: escribe la línea JSON tal cual a stdout
+# para que Cloud Logging la interprete como log estructurado
+logger_resumen = logging.getLogger(f'{__name__}.resumen')
+_manejador_resumen = logging.StreamHandler(sys.stdout)
+_manejador_resumen.setFormatter(logging.Formatter('%(message)s'))
+logger_resumen.addHandler(_manejador_resumen)
+logger_resumen.propagate = False
+
+# Severidad de Cloud Logging según el estado final de la extracción
+SEVERIDAD_POR_ESTADO = {
+    'exitoso': 'INFO',
+    'parcial': 'WARNING',
+    'fallido': 'ERROR'
+}
+
 
 # Constantes de configuración
 ID_PROYECTO = os.environ.get('GCP_PROJECT', os.environ.get('GOOGLE_CLOUD_PROJECT', ''))
 NOMBRE_TOPIC = 'clima-datos-crudos'
 URL_BASE_API = 'https://weather.googleapis.com/v1/currentConditions:lookup'
 NOMBRE_SECRET_API_KEY = 'weather-api-key'
+TIMEOUT_CONFIRMACION_PUBSUB = 30
+TTL_CACHE_API_KEY = 3600  # segundos
+MAXIMO_BYTES_ERROR_API = 512  # bytes del cuerpo de error incluidos en el log
+# Ventana en la que una ubicación publicada se considera vigente y no se vuelve
+# a consultar. Desactivada por defecto (0): se mide desde el inicio de la
+# invocación, así que una invocación atrasada (cold start, cola de solicitudes)
+# acerca a la siguiente y una ventana cercana al intervalo del scheduler
+# (1 minuto) omitiría un minuto completo de datos. Si se activa, debe dejar
+# margen holgado bajo ese intervalo.
+VENTANA_FRESCURA_SEGUNDOS = float(os.environ.get('VENTANA_FRESCURA_SEGUNDOS', '0'))
+VERSION_EXTRACTOR = '2.0.0'  # Actualizado a v2 (API Key)
+
+# Atributos fijos de los mensajes publicados a Pub/Sub
+TIPO_MENSAJE = 'datos_clima'
+VERSION_MENSAJE = '2.0'
+
+# Formato del payload publicado: 'msgpack' (por defecto, más compacto)
+# o 'json' (legible, para depuración)
+FORMATO_MENSAJE = os.environ.get('FORMATO_MENSAJE', 'msgpack').lower()
+TIPO_CONTENIDO_MENSAJE = (
+    'application/json' if FORMATO_MENSAJE == 'json' else 'application/msgpack'
+)
+
+# Ruta completa del topic (formato estable de Pub/Sub), calculada una sola vez
+_RUTA_TOPIC = f'projects/{ID_PROYECTO}/topics/{NOMBRE_TOPIC}'
 
 # Ubicaciones a monitorear en Chile
-# Cobertura de norte a sur del país, incluyendo principales ciudades y destinos turísticos
+# Cobertura de norte a sur del país, incluyendo principales ciudades y destinos turísticos.
+# La 'zona' se usa como ordering key y atributo de los mensajes en Pub/Sub.
 UBICACIONES_MONITOREO = [
     # ZONA NORTE GRANDE
     {
         'nombre': 'Arica',
         'latitud': -18.4746,
         'longitud': -70.2979,
-        'descripcion': 'Arica, Chile - Ciudad de la Eterna Primavera'
+        'descripcion': 'Arica, Chile - Ciudad de la Eterna Primavera',
+        'zona': 'norte'
     },
     {
         'nombre': 'Iquique',
         'latitud': -20.2307,
         'longitud': -70.1355,
-        'descripcion': 'Iquique, Chile - Playas y Zona Franca'
+        'descripcion': 'Iquique, Chile - Playas y Zona Franca',
+        'zona': 'norte'
     },
     {
         'nombre': 'San Pedro de Atacama',
         'latitud': -22.9098,
         'longitud': -68.1995,
-        'descripcion': 'San Pedro de Atacama, Chile - Desierto y Turismo Astronómico'
+        'descripcion': 'San Pedro de Atacama, Chile - Desierto y Turismo Astronómico',
+        'zona': 'norte'
     },
 
     # ZONA NORTE CHICO
@@ -62,7 +121,8 @@ UBICACIONES_MONITOREO = [
         'nombre': 'La Serena',
         'latitud': -29.9027,
         'longitud': -71.2519,
-        'descripcion': 'La Serena, Chile - Playas y Valle del Elqui'
+        'descripcion': 'La Serena, Chile - Playas y Valle del Elqui',
+        'zona': 'norte'
     },
 
     # ZONA CENTRAL
@@ -70,31 +130,36 @@ UBICACIONES_MONITOREO = [
         'nombre': 'Viña del Mar',
         'latitud': -33.0246,
         'longitud': -71.5516,
-        'descripcion': 'Viña del Mar, Chile - Ciudad Jardín'
+        'descripcion': 'Viña del Mar, Chile - Ciudad Jardín',
+        'zona': 'central'
     },
     {
         'nombre': 'Valparaíso',
         'latitud': -33.0472,
         'longitud': -71.6127,
-        'descripcion': 'Valparaíso, Chile - Puerto Principal y Patrimonio UNESCO'
+        'descripcion': 'Valparaíso, Chile - Puerto Principal y Patrimonio UNESCO',
+        'zona': 'central'
     },
     {
         'nombre': 'Santiago',
         'latitud': -33.4489,
         'longitud': -70.6693,
-        'descripcion': 'Santiago, Chile - Capital y Región Metropolitana'
+        'descripcion': 'Santiago, Chile - Capital y Región Metropolitana',
+        'zona': 'central'
     },
     {
         'nombre': 'Farellones',
         'latitud': -33.3558,
         'longitud': -70.2989,
-        'descripcion': 'Farellones, Chile - Centro de Esquí Cordillera de Los Andes'
+        'descripcion': 'Farellones, Chile - Centro de Esquí Cordillera de Los Andes',
+        'zona': 'central'
     },
     {
         'nombre': 'Pichilemu',
         'latitud': -34.3870,
         'longitud': -72.0033,
-        'descripcion': 'Pichilemu, Chile - Capital del Surf'
+        'descripcion': 'Pichilemu, Chile - Capital del Surf',
+        'zona': 'central'
     },
 
     # ZONA SUR
@@ -102,43 +167,50 @@ UBICACIONES_MONITOREO = [
         'nombre': 'Concepción',
         'latitud': -36.8270,
         'longitud': -73.0498,
-        'descripcion': 'Concepción, Chile - Capital del Biobío'
+        'descripcion': 'Concepción, Chile - Capital del Biobío',
+        'zona': 'sur'
     },
     {
         'nombre': 'Temuco',
         'latitud': -38.7359,
         'longitud': -72.5904,
-        'descripcion': 'Temuco, Chile - Puerta de La Araucanía'
+        'descripcion': 'Temuco, Chile - Puerta de La Araucanía',
+        'zona': 'sur'
     },
     {
         'nombre': 'Pucón',
         'latitud': -39.2819,
         'longitud': -71.9755,
-        'descripcion': 'Pucón, Chile - Turismo Aventura y Volcán Villarrica'
+        'descripcion': 'Pucón, Chile - Turismo Aventura y Volcán Villarrica',
+        'zona': 'sur'
     },
     {
         'nombre': 'Valdivia',
         'latitud': -39.8142,
         'longitud': -73.2459,
-        'descripcion': 'Valdivia, Chile - Ciudad de los Ríos'
+        'descripcion': 'Valdivia, Chile - Ciudad de los Ríos',
+        'zona': 'sur'
     },
     {
         'nombre': 'Puerto Varas',
         'latitud': -41.3194,
         'longitud': -72.9833,
-        'descripcion': 'Puerto Varas, Chile - Región de los Lagos'
+        'descripcion': 'Puerto Varas, Chile - Región de los Lagos',
+        'zona': 'sur'
     },
     {
         'nombre': 'Puerto Montt',
         'latitud': -41.4693,
         'longitud': -72.9424,
-        'descripcion': 'Puerto Montt, Chile - Puerta de la Patagonia'
+        'descripcion': 'Puerto Montt, Chile - Puerta de la Patagonia',
+        'zona': 'sur'
     },
     {
         'nombre': 'Castro',
         'latitud': -42.4827,
         'longitud': -73.7622,
-        'descripcion': 'Castro, Chiloé - Palafitos y Cultura Chilota'
+        'descripcion': 'Castro, Chiloé - Palafitos y Cultura Chilota',
+        'zona': 'sur'
     },
 
     # ZONA AUSTRAL
@@ -146,19 +218,22 @@ UBICACIONES_MONITOREO = [
         'nombre': 'Coyhaique',
         'latitud': -45.5752,
         'longitud': -72.0662,
-        'descripcion': 'Coyhaique, Chile - Capital de Aysén'
+        'descripcion': 'Coyhaique, Chile - Capital de Aysén',
+        'zona': 'austral'
     },
     {
         'nombre': 'Puerto Natales',
         'latitud': -51.7283,
         'longitud': -72.5085,
-        'descripcion': 'Puerto Natales, Chile - Acceso Torres del Paine'
+        'descripcion': 'Puerto Natales, Chile - Acceso Torres del Paine',
+        'zona': 'austral'
     },
     {
         'nombre': 'Punta Arenas',
         'latitud': -53.1638,
         'longitud': -70.9171,
-        'descripcion': 'Punta Arenas, Chile - Ciudad Austral del Estrecho'
+        'descripcion': 'Punta Arenas, Chile - Ciudad Austral del Estrecho',
+        'zona': 'austral'
     },
 
     # TERRITORIO INSULAR
@@ -166,10 +241,51 @@ UBICACIONES_MONITOREO = [
         'nombre': 'Isla de Pascua',
         'latitud': -27.1127,
         'longitud': -109.3497,
-        'descripcion': 'Isla de Pascua (Rapa Nui), Chile - Patrimonio UNESCO'
+        'descripcion': 'Isla de Pascua (Rapa Nui), Chile - Patrimonio UNESCO',
+        'zona': 'insular'
     }
 ]
 
+# Clientes de GCP creados al cargar el módulo: Cloud Functions reutiliza el
+# contenedor entre invocaciones, por lo que se inicializan una sola vez.
+# El lote de Pub/Sub se dimensiona para enviar todas las ubicaciones juntas,
+# y el orden de mensajes se habilita para particionar por zona.
+_cliente_publicador = pubsub_v1.PublisherClient(
+    batch_settings=pubsub_v1.types.BatchSettings(
+        max_messages=len(UBICACIONES_MONITOREO),
+        max_bytes=1024 * 1024,
+        max_latency=0.05
+    ),
+    publisher_options=pubsub_v1.types.PublisherOptions(
+        enable_message_ordering=True
+    )
+)
+
+# Cliente de Secret Manager: se crea de forma perezosa en el primer fallo
+# de la caché de la API Key (ver obtener_cliente_secrets)
+_cliente_secrets = None
+
+# Cliente HTTP compartido con keep-alive y HTTP/2: las consultas de todos
+# los hilos de extracción se multiplexan sobre las mismas conexiones TLS
+# a la Weather API, entre ubicaciones e invocaciones.
+_cliente_http = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+)
+
+# Caché de la API Key por contenedor, refrescada cada TTL_CACHE_API_KEY.
+# El candado evita renovaciones simultáneas cuando la instancia atiende
+# varias invocaciones concurrentes.
+_cache_api_key = {'valor': None, 'obtenida_en': 0.0}
+_candado_api_key = threading.Lock()
+
+# Instante (time.monotonic) de inicio de la invocación que publicó por última
+# vez cada ubicación en este contenedor. Varias invocaciones concurrentes lo
+# escriben; cada escritura es una asignación atómica de una clave y gana la
+# última
+_ultima_extraccion: Dict[str, float] = {}
+
 
 class ErrorExtraccionClima(Exception):
     """Excepción levantada cuando falla la extracción de datos climáticos."""
@@ -186,72 +302,170 @@ class ErrorConfiguracion(Exception):
     pass
 
 
+class UbicacionPreparada(NamedTuple):
+    """
+    Ubicación con los datos precalculados que usa el camino caliente.
+
+    Es una tupla con campos nombrados: más liviana que un dict por ubicación
+    y sin búsquedas por clave al leer sus campos.
+    """
+    nombre: str
+    latitud: float
+    longitud: float
+    zona: str
+    sufijo_url: str
+    metadata_base: Dict[str, Any]
+
+
+def serializar_json(datos: Dict[str, Any]) -> bytes:
+    """
+    Serializa datos a JSON codificado en UTF-8.
+
+    Args:
+        datos: Datos a serializar
+
+    Returns:
+        bytes: JSON en UTF-8 (sin escapar caracteres no ASCII)
+    """
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False).encode('utf-8')
+
+
+def deserializar_json(contenido: bytes) -> Any:
+    """
+    Deserializa un documento JSON recibido como bytes.
+
+    Args:
+        contenido: JSON en bytes
+
+    Returns:
+        Any: Estructura de datos decodificada
+    """
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+def serializar_mensaje(datos: Dict[str, Any]) -> bytes:
+    """
+    Serializa el payload de un mensaje según FORMATO_MENSAJE.
+
+    Args:
+        datos: Datos a serializar
+
+    Returns:
+        bytes: Payload en MessagePack, o JSON UTF-8 en modo depuración
+    """
+    if TIPO_CONTENIDO_MENSAJE == 'application/json':
+        return serializar_json(datos)
+    return msgpack.packb(datos, use_bin_type=True)
+
+
+def obtener_marca_tiempo_utc() -> str:
+    """
+    Obtiene la hora actual en UTC en formato ISO 8601.
+
+    Equivale a datetime.now(timezone.utc).isoformat() sin crear objetos datetime.
+
+    Returns:
+        str: Marca de tiempo, ej: '2024-01-15T12:00:00.123456+00:00'
+    """
+    segundos, nanosegundos = divmod(time.time_ns(), 1_000_000_000)
+    return (
+        time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(segundos))
+        + f'.{nanosegundos // 1000:06d}+00:00'
+    )
+
+
+def obtener_cliente_secrets() -> Any:
+    """
+    Obtiene el cliente de Secret Manager, creándolo en el primer uso.
+
+    El módulo de Secret Manager y su canal gRPC no se cargan al importar
+    main.py, sino la primera vez que la caché de la API Key está vacía o
+    expirada; luego el cliente se reutiliza en cada renovación.
+
+    Returns:
+        SecretManagerServiceClient: Cliente reutilizado por el contenedor
+    """
+    global _cliente_secrets
+    if _cliente_secrets is None:
+        from google.cloud import secretmanager
+        _cliente_secrets = secretmanager.SecretManagerServiceClient()
+    return _cliente_secrets
+
+
 def obtener_api_key() -> str:
     """
     Obtiene la API Key de Google Weather desde Secret Manager.
 
+    La API Key se mantiene en caché a nivel de módulo durante
+    TTL_CACHE_API_KEY segundos, evitando consultar Secret Manager
+    en cada invocación de un contenedor reutilizado.
+
     Returns:
         str: API Key para autenticación con Weather API
 
     Raises:
         ErrorConfiguracion: Si no se puede obtener la API Key
     """
-    try:
-        cliente_secrets = secretmanager.SecretManagerServiceClient()
+    with _candado_api_key:
+        ahora = time.monotonic()
+        if (
+            _cache_api_key['valor'] is not None
+            and ahora - _cache_api_key['obtenida_en'] < TTL_CACHE_API_KEY
+        ):
+            return _cache_api_key['valor']
 
-        # Construir nombre del secret
-        nombre_secret = f"projects/{ID_PROYECTO}/secrets/{NOMBRE_SECRET_API_KEY}/versions/latest"
+        try:
+            # Construir nombre del secret
+            nombre_secret = f"projects/{ID_PROYECTO}/secrets/{NOMBRE_SECRET_API_KEY}/versions/latest"
 
-        # Obtener el secret
-        respuesta = cliente_secrets.access_secret_version(request={"name": nombre_secret})
-        api_key = respuesta.payload.data.decode('UTF-8')
+            # Obtener el secret
+            respuesta = obtener_cliente_secrets().access_secret_version(request={"name": nombre_secret})
+            api_key = respuesta.payload.data.decode('UTF-8')
 
-        logger.info("API Key obtenida exitosamente desde Secret Manager")
-        return api_key
+            _cache_api_key['valor'] = api_key
+            _cache_api_key['obtenida_en'] = ahora
 
-    except Exception as e:
-        mensaje_error = f"Error al obtener API Key desde Secret Manager: {str(e)}"
-        logger.error(mensaje_error)
-        raise ErrorConfiguracion(mensaje_error)
+            return api_key
 
+        except Exception as e:
+            mensaje_error = f"Error al obtener API Key desde Secret Manager: {str(e)}"
+            logger.error(mensaje_error)
+            raise ErrorConfiguracion(mensaje_error)
 
-def construir_url_api(latitud: float, longitud: float, api_key: str) -> str:
+
+def construir_sufijo_url(latitud: float, longitud: float) -> str:
     """
-    Construye la URL completa para la llamada a la Weather API.
+    Construye los query parameters de ubicación para la Weather API.
+
+    No incluye la API Key, por lo que se puede precalcular al cargar el módulo.
 
     Args:
         latitud: Latitud de la ubicación
         longitud: Longitud de la ubicación
-        api_key: API Key para autenticación
 
     Returns:
-        str: URL completa con query parameters
+        str: Query string de la ubicación (se concatena tras URL_BASE_API)
     """
-    # Construir URL con query parameters
-    url = (
-        f"{URL_BASE_API}"
-        f"?key={api_key}"
-        f"&location.latitude={latitud}"
+    return (
+        f"?location.latitude={latitud}"
         f"&location.longitude={longitud}"
         f"&languageCode=es"
     )
 
-    return url
-
 
 def llamar_weather_api(
-    latitud: float,
-    longitud: float,
-    nombre_ubicacion: str,
+    ubicacion_preparada: UbicacionPreparada,
     api_key: str
 ) -> Dict[str, Any]:
     """
     Realiza llamada GET a la Google Weather API para obtener condiciones actuales.
 
     Args:
-        latitud: Latitud de la ubicación
-        longitud: Longitud de la ubicación
-        nombre_ubicacion: Nombre descriptivo de la ubicación
+        ubicacion_preparada: Ubicación con su sufijo de URL precalculado
         api_key: API Key para autenticación
 
     Returns:
@@ -260,31 +474,37 @@ def llamar_weather_api(
     Raises:
         ErrorExtraccionClima: Si la llamada a la API falla
     """
-    try:
-        # Construir URL con query parameters
-        url = construir_url_api(latitud, longitud, api_key)
+    nombre_ubicacion = ubicacion_preparada.nombre
 
-        logger.info(f"Consultando clima para {nombre_ubicacion} ({latitud}, {longitud})")
-
-        # Hacer GET request
-        respuesta = requests.get(url, timeout=30)
-
-        if respuesta.status_code != 200:
-            mensaje_error = (
-                f"Error en API para {nombre_ubicacion}: "
-                f"Estado {respuesta.status_code}, Respuesta: {respuesta.text[:500]}"
-            )
-            logger.error(mensaje_error)
-            raise ErrorExtraccionClima(mensaje_error)
+    try:
+        # Construir URL con query parameters precalculados. La API Key va en
+        # el header X-Goog-Api-Key para que nunca aparezca en URLs registradas
+        url = URL_BASE_API + ubicacion_preparada.sufijo_url
+
+        # Hacer GET request en modo streaming: el cuerpo solo se descarga
+        # completo si la respuesta es exitosa
+        with _cliente_http.stream(
+            'GET', url, headers={'X-Goog-Api-Key': api_key}
+        ) as respuesta:
+            if respuesta.status_code != 200:
+                # Leer solo el inicio del cuerpo de error
+                cuerpo = next(
+                    respuesta.iter_bytes(MAXIMO_BYTES_ERROR_API), b''
+                ).decode('utf-8', errors='replace')
+                mensaje_error = (
+                    f"Error en API para {nombre_ubicacion}: "
+                    f"Estado {respuesta.status_code}, Respuesta: {cuerpo}"
+                )
+                logger.error(mensaje_error)
+                raise ErrorExtraccionClima(mensaje_error)
 
-        datos_clima = respuesta.json()
-        logger.info(f"Datos climáticos obtenidos exitosamente para {nombre_ubicacion}")
+            datos_clima = deserializar_json(respuesta.read())
 
         return datos_clima
 
     except ErrorExtraccionClima:
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         mensaje_error = f"Error de red al llamar API para {nombre_ubicacion}: {str(e)}"
         logger.error(mensaje_error)
         raise ErrorExtraccionClima(mensaje_error)
@@ -296,31 +516,26 @@ def llamar_weather_api(
 
 def enriquecer_datos_clima(
     datos_clima: Dict[str, Any],
-    ubicacion: Dict[str, Any]
+    ubicacion_preparada: UbicacionPreparada,
+    marca_tiempo: str
 ) -> Dict[str, Any]:
     """
     Enriquece los datos climáticos con metadata adicional.
 
+    Parte de una copia de la metadata precalculada de la ubicación y solo
+    completa la marca de tiempo y los datos crudos.
+
     Args:
         datos_clima: Datos crudos de la Weather API
-        ubicacion: Información de la ubicación monitoreada
+        ubicacion_preparada: Ubicación con su metadata base precalculada
+        marca_tiempo: Marca de tiempo de extracción (ISO 8601, UTC)
 
     Returns:
         dict: Datos climáticos enriquecidos con metadata
     """
-    marca_tiempo = datetime.now(timezone.utc).isoformat()
-
-    datos_enriquecidos = {
-        'marca_tiempo_extraccion': marca_tiempo,
-        'nombre_ubicacion': ubicacion['nombre'],
-        'coordenadas': {
-            'latitud': ubicacion['latitud'],
-            'longitud': ubicacion['longitud']
-        },
-        'descripcion_ubicacion': ubicacion['descripcion'],
-        'datos_clima_raw': datos_clima,
-        'version_extractor': '2.0.0'  # Actualizado a v2 (API Key)
-    }
+    datos_enriquecidos = ubicacion_preparada.metadata_base.copy()
+    datos_enriquecidos['marca_tiempo_extraccion'] = marca_tiempo
+    datos_enriquecidos['datos_clima_raw'] = datos_clima
 
     return datos_enriquecidos
 
@@ -329,54 +544,105 @@ def publicar_a_pubsub(
     cliente_publicador: pubsub_v1.PublisherClient,
     ruta_topic: str,
     datos_mensaje: Dict[str, Any],
-    nombre_ubicacion: str
-) -> str:
+    nombre_ubicacion: str,
+    zona: str
+) -> Future:
     """
-    Publica datos climáticos a un topic de Pub/Sub.
+    Publica datos climáticos a un topic de Pub/Sub sin esperar confirmación.
+
+    El cliente agrupa los mensajes en lotes; la confirmación se obtiene
+    después con confirmar_publicacion(). La zona se usa como ordering key,
+    de modo que los suscriptores pueden escalar de forma independiente por zona.
+    El atributo content_type indica a los suscriptores cómo decodificar el payload.
 
     Args:
         cliente_publicador: Cliente de Pub/Sub Publisher
         ruta_topic: Ruta completa del topic
         datos_mensaje: Datos a publicar
         nombre_ubicacion: Nombre de la ubicación (para logging)
+        zona: Zona geográfica de la ubicación (ordering key)
 
     Returns:
-        str: ID del mensaje publicado
+        Future: Futuro que resuelve al ID del mensaje publicado
 
     Raises:
         ErrorPublicacionPubSub: Si falla la publicación
     """
     try:
-        # Convertir datos a JSON bytes
-        mensaje_json = json.dumps(datos_mensaje, ensure_ascii=False)
-        mensaje_bytes = mensaje_json.encode('utf-8')
-
-        # Atributos del mensaje para filtrado y routing
-        atributos = {
-            'ubicacion': nombre_ubicacion,
-            'tipo': 'datos_clima',
-            'version': '2.0'
-        }
+        # Serializar payload (MessagePack o JSON según FORMATO_MENSAJE)
+        mensaje_bytes = serializar_mensaje(datos_mensaje)
 
-        # Publicar mensaje
-        futuro = cliente_publicador.publish(
+        # Publicar mensaje (se encola en el lote actual) con atributos
+        # para filtrado y routing
+        return cliente_publicador.publish(
             ruta_topic,
             mensaje_bytes,
-            **atributos
+            ordering_key=zona,
+            ubicacion=nombre_ubicacion,
+            zona=zona,
+            tipo=TIPO_MENSAJE,
+            version=VERSION_MENSAJE,
+            content_type=TIPO_CONTENIDO_MENSAJE
         )
 
-        # Esperar confirmación
-        id_mensaje = futuro.result(timeout=10)
+    except Exception as e:
+        mensaje_error = f"Error al publicar mensaje para {nombre_ubicacion}: {str(e)}"
+        logger.error(mensaje_error)
+        reanudar_publicacion_zona(cliente_publicador, ruta_topic, zona)
+        raise ErrorPublicacionPubSub(mensaje_error)
 
-        logger.info(
-            f"Mensaje publicado exitosamente a Pub/Sub para {nombre_ubicacion}. "
-            f"ID: {id_mensaje}"
-        )
 
-        return id_mensaje
+def reanudar_publicacion_zona(
+    cliente_publicador: pubsub_v1.PublisherClient,
+    ruta_topic: str,
+    zona: str
+) -> None:
+    """
+    Reanuda la publicación de una zona tras un fallo.
+
+    Con ordering keys, el cliente pausa la clave ante un error y rechaza
+    nuevos mensajes hasta reanudarla. Como el cliente vive mientras el
+    contenedor siga activo, se reanuda explícitamente para no bloquear
+    la zona en invocaciones siguientes.
 
+    Args:
+        cliente_publicador: Cliente de Pub/Sub Publisher
+        ruta_topic: Ruta completa del topic
+        zona: Zona geográfica (ordering key) a reanudar
+    """
+    try:
+        cliente_publicador.resume_publish(ruta_topic, zona)
     except Exception as e:
-        mensaje_error = f"Error al publicar mensaje para {nombre_ubicacion}: {str(e)}"
+        logger.warning(f"Error al reanudar publicación de zona {zona}: {str(e)}")
+
+
+def confirmar_publicacion(
+    futuro: Future,
+    nombre_ubicacion: str,
+    timeout: float = TIMEOUT_CONFIRMACION_PUBSUB
+) -> str:
+    """
+    Espera la confirmación de un mensaje publicado a Pub/Sub.
+
+    Args:
+        futuro: Futuro devuelto por publicar_a_pubsub()
+        nombre_ubicacion: Nombre de la ubicación (para logging)
+        timeout: Segundos máximos de espera (0 si ya se esperó el lote)
+
+    Returns:
+        str: ID del mensaje publicado
+
+    Raises:
+        ErrorPublicacionPubSub: Si la publicación falla o no se confirma a tiempo
+    """
+    try:
+        return futuro.result(timeout=timeout)
+
+    except Exception as e:
+        mensaje_error = (
+            f"Error al publicar mensaje para {nombre_ubicacion}: "
+            f"{str(e) or type(e).__name__}"
+        )
         logger.error(mensaje_error)
         raise ErrorPublicacionPubSub(mensaje_error)
 
@@ -394,6 +660,125 @@ def obtener_ubicaciones_monitoreo() -> List[Dict[str, Any]]:
     return UBICACIONES_MONITOREO
 
 
+def preparar_ubicaciones(
+    ubicaciones: List[Dict[str, Any]]
+) -> Tuple[UbicacionPreparada, ...]:
+    """
+    Precalcula los datos por ubicación que no cambian entre invocaciones.
+
+    Args:
+        ubicaciones: Lista de ubicaciones a monitorear
+
+    Returns:
+        tuple: Ubicaciones con su sufijo de URL y metadata base precalculados
+    """
+    return tuple(
+        UbicacionPreparada(
+            nombre=ubicacion['nombre'],
+            latitud=ubicacion['latitud'],
+            longitud=ubicacion['longitud'],
+            zona=ubicacion['zona'],
+            sufijo_url=construir_sufijo_url(ubicacion['latitud'], ubicacion['longitud']),
+            metadata_base={
+                # Orden de campos del mensaje publicado; los valores None
+                # se completan en enriquecer_datos_clima()
+                'marca_tiempo_extraccion': None,
+                'nombre_ubicacion': ubicacion['nombre'],
+                'coordenadas': {
+                    'latitud': ubicacion['latitud'],
+                    'longitud': ubicacion['longitud']
+                },
+                'descripcion_ubicacion': ubicacion['descripcion'],
+                'datos_clima_raw': None,
+                'version_extractor': VERSION_EXTRACTOR
+            }
+        )
+        for ubicacion in ubicaciones
+    )
+
+
+# Ubicaciones preparadas una sola vez por contenedor
+_ubicaciones_preparadas = preparar_ubicaciones(obtener_ubicaciones_monitoreo())
+
+
+def extraccion_vigente(nombre_ubicacion: str) -> bool:
+    """
+    Indica si la ubicación se publicó dentro de la ventana de frescura.
+
+    Args:
+        nombre_ubicacion: Nombre de la ubicación
+
+    Returns:
+        bool: True si la última publicación confirmada sigue vigente
+    """
+    ultima = _ultima_extraccion.get(nombre_ubicacion)
+    return ultima is not None and time.monotonic() - ultima < VENTANA_FRESCURA_SEGUNDOS
+
+
+def procesar_ubicacion(
+    ubicacion_preparada: UbicacionPreparada,
+    api_key: str,
+    cliente_publicador: pubsub_v1.PublisherClient,
+    ruta_topic: str,
+    marca_tiempo: str
+) -> Tuple[Dict[str, Any], Optional[Future]]:
+    """
+    Extrae, enriquece y publica los datos climáticos de una ubicación.
+
+    Se ejecuta en un hilo del pool de extracción, por lo que no modifica
+    estado compartido: el resultado se devuelve como detalle de la ubicación
+    junto al futuro de publicación, que se confirma después del join.
+
+    Args:
+        ubicacion_preparada: Ubicación con sus datos precalculados
+        api_key: API Key para autenticación
+        cliente_publicador: Cliente de Pub/Sub Publisher
+        ruta_topic: Ruta completa del topic
+        marca_tiempo: Marca de tiempo de extracción compartida por la invocación
+
+    Returns:
+        Tuple[dict, Future | None]: Detalle de la ubicación y futuro de
+        publicación (None si la ubicación se omitió o falló antes de publicar)
+    """
+    nombre_ubicacion = ubicacion_preparada.nombre
+    detalle_ubicacion = {
+        'ubicacion': nombre_ubicacion,
+        'estado': 'pendiente'
+    }
+    futuro = None
+
+    # Omitir ubicaciones publicadas recientemente por este contenedor
+    if extraccion_vigente(nombre_ubicacion):
+        detalle_ubicacion['estado'] = 'omitido'
+        return detalle_ubicacion, futuro
+
+    try:
+        # Llamar a Weather API con GET + API Key
+        datos_clima = llamar_weather_api(ubicacion_preparada, api_key)
+
+        # Enriquecer datos
+        datos_enriquecidos = enriquecer_datos_clima(
+            datos_clima, ubicacion_preparada, marca_tiempo
+        )
+
+        # Publicar a Pub/Sub (la confirmación se espera después del join)
+        futuro = publicar_a_pubsub(
+            cliente_publicador,
+            ruta_topic,
+            datos_enriquecidos,
+            nombre_ubicacion,
+            ubicacion_preparada.zona
+        )
+
+    except (ErrorExtraccionClima, ErrorPublicacionPubSub) as e:
+        # Error específico en esta ubicación
+        detalle_ubicacion['estado'] = 'fallido'
+        detalle_ubicacion['error'] = str(e)
+        logger.error(f"Error procesando {nombre_ubicacion}: {str(e)}")
+
+    return detalle_ubicacion, futuro
+
+
 @functions_framework.http
 def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
     """
@@ -401,7 +786,7 @@ def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
 
     Esta función es invocada por Cloud Scheduler periódicamente para:
     1. Obtener API Key desde Secret Manager
-    2. Consultar Weather API para cada ubicación configurada (GET con query params)
+    2. Consultar Weather API en paralelo para cada ubicación configurada (GET con query params)
     3. Enriquecer datos con metadata
     4. Publicar a Pub/Sub topic 'clima-datos-crudos'
 
@@ -425,20 +810,18 @@ def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
             ]
         }
     """
-    logger.info("=" * 60)
-    logger.info("Iniciando extracción de datos climáticos")
-    logger.info("=" * 60)
+    inicio = time.monotonic()
 
     resultados = {
         'estado': 'exitoso',
         'total_ubicaciones': 0,
         'mensajes_publicados': 0,
         'mensajes_fallidos': 0,
+        'mensajes_omitidos': 0,
         'detalles': [],
         'errores': []
     }
 
-    cliente_publicador = None
     api_key = None
 
     try:
@@ -450,70 +833,73 @@ def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
                 "Establecer variable de entorno GCP_PROJECT o GOOGLE_CLOUD_PROJECT"
             )
 
-        # Obtener API Key desde Secret Manager
-        logger.info("Obteniendo API Key desde Secret Manager...")
+        # Obtener API Key (caché del contenedor o Secret Manager)
         api_key = obtener_api_key()
 
-        # Crear cliente de Pub/Sub
-        cliente_publicador = pubsub_v1.PublisherClient()
-        ruta_topic = cliente_publicador.topic_path(proyecto, NOMBRE_TOPIC)
-
-        logger.info(f"Publicando a topic: {ruta_topic}")
-
-        # Obtener ubicaciones a monitorear
-        ubicaciones = obtener_ubicaciones_monitoreo()
+        # Obtener ubicaciones a monitorear (precalculadas al cargar el módulo)
+        ubicaciones = _ubicaciones_preparadas
         resultados['total_ubicaciones'] = len(ubicaciones)
 
-        logger.info(f"Total de ubicaciones a procesar: {len(ubicaciones)}")
-
-        # Procesar cada ubicación
-        for ubicacion in ubicaciones:
-            nombre_ubicacion = ubicacion['nombre']
-            detalle_ubicacion = {
-                'ubicacion': nombre_ubicacion,
-                'estado': 'pendiente'
-            }
-
-            try:
-                # Llamar a Weather API con GET + API Key
-                datos_clima = llamar_weather_api(
-                    ubicacion['latitud'],
-                    ubicacion['longitud'],
-                    nombre_ubicacion,
-                    api_key
-                )
-
-                # Enriquecer datos
-                datos_enriquecidos = enriquecer_datos_clima(datos_clima, ubicacion)
-
-                # Publicar a Pub/Sub
-                id_mensaje = publicar_a_pubsub(
-                    cliente_publicador,
-                    ruta_topic,
-                    datos_enriquecidos,
-                    nombre_ubicacion
-                )
+        # Todas las ubicaciones de una invocación comparten la marca de tiempo
+        marca_tiempo = obtener_marca_tiempo_utc()
+
+        # Procesar ubicaciones en paralelo: las llamadas a la API son I/O-bound,
+        # por lo que la latencia total se acerca a la de la consulta más lenta
+        procesar = partial(
+            procesar_ubicacion,
+            api_key=api_key,
+            cliente_publicador=_cliente_publicador,
+            ruta_topic=_RUTA_TOPIC,
+            marca_tiempo=marca_tiempo
+        )
+        with ThreadPoolExecutor(max_workers=len(ubicaciones) or 1) as ejecutor:
+            procesados = list(ejecutor.map(procesar, ubicaciones))
+
+        # Cada hilo publica apenas termina su consulta, así que las
+        # confirmaciones avanzan mientras otras consultas siguen en curso.
+        # Se espera a todas con un único plazo compartido, no uno por mensaje.
+        wait(
+            [futuro for _, futuro in procesados if futuro is not None],
+            timeout=TIMEOUT_CONFIRMACION_PUBSUB
+        )
 
-                # Registrar éxito
-                detalle_ubicacion['estado'] = 'exitoso'
-                detalle_ubicacion['id_mensaje'] = id_mensaje
+        # Consolidar resultados (executor.map preserva el orden de las ubicaciones)
+        for ubicacion_preparada, (detalle_ubicacion, futuro) in zip(ubicaciones, procesados):
+            if futuro is not None:
+                nombre_ubicacion = detalle_ubicacion['ubicacion']
+                try:
+                    detalle_ubicacion['id_mensaje'] = confirmar_publicacion(
+                        futuro, nombre_ubicacion, timeout=0
+                    )
+                    detalle_ubicacion['estado'] = 'exitoso'
+                    _ultima_extraccion[nombre_ubicacion] = inicio
+                except ErrorPublicacionPubSub as e:
+                    detalle_ubicacion['estado'] = 'fallido'
+                    detalle_ubicacion['error'] = str(e)
+                    logger.error(f"Error procesando {nombre_ubicacion}: {str(e)}")
+                    reanudar_publicacion_zona(
+                        _cliente_publicador,
+                        _RUTA_TOPIC,
+                        ubicacion_preparada.zona
+                    )
+
+            if detalle_ubicacion['estado'] == 'exitoso':
                 resultados['mensajes_publicados'] += 1
-
-            except (ErrorExtraccionClima, ErrorPublicacionPubSub) as e:
-                # Error específico en esta ubicación
-                detalle_ubicacion['estado'] = 'fallido'
-                detalle_ubicacion['error'] = str(e)
+            elif detalle_ubicacion['estado'] == 'omitido':
+                resultados['mensajes_omitidos'] += 1
+            else:
                 resultados['mensajes_fallidos'] += 1
                 resultados['errores'].append({
-                    'ubicacion': nombre_ubicacion,
-                    'error': str(e)
+                    'ubicacion': detalle_ubicacion['ubicacion'],
+                    'error': detalle_ubicacion['error']
                 })
-                logger.error(f"Error procesando {nombre_ubicacion}: {str(e)}")
 
             resultados['detalles'].append(detalle_ubicacion)
 
-        # Determinar estado final
-        if resultados['mensajes_fallidos'] == resultados['total_ubicaciones']:
+        # Determinar estado final (las ubicaciones omitidas siguen vigentes,
+        # por lo que no cuentan como fallos)
+        ubicaciones_intentadas = resultados['total_ubicaciones'] - resultados['mensajes_omitidos']
+        if resultados['mensajes_fallidos'] > 0 and resultados['mensajes_fallidos'] == ubicaciones_intentadas:
             resultados['estado'] = 'fallido'
             codigo_estado = 500
         elif resultados['mensajes_fallidos'] > 0:
@@ -523,12 +909,19 @@ def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
             resultados['estado'] = 'exitoso'
             codigo_estado = 200
 
-        logger.info("=" * 60)
-        logger.info(
-            f"Extracción completada: {resultados['mensajes_publicados']} exitosos, "
-            f"{resultados['mensajes_fallidos']} fallidos"
-        )
-        logger.info("=" * 60)
+        # Único registro informativo de la invocación, con el detalle
+        # de todas las ubicaciones como campos estructurados
+        registro_resumen = {
+            'severity': SEVERIDAD_POR_ESTADO[resultados['estado']],
+            'message': (
+                f"Extracción completada: {resultados['mensajes_publicados']} exitosos, "
+                f"{resultados['mensajes_fallidos']} fallidos, "
+                f"{resultados['mensajes_omitidos']} omitidos"
+            ),
+            'duracion_segundos': round(time.monotonic() - inicio, 3),
+            **resultados
+        }
+        logger_resumen.info(serializar_json(registro_resumen).decode('utf-8'))
 
         return resultados, codigo_estado
 
@@ -547,12 +940,3 @@ def extraer_clima(solicitud: Request) -> Tuple[Dict[str, Any], int]:
             'error': f"Error inesperado: {str(e)}",
             'tipo_error': 'desconocido'
         }, 500
-
-    finally:
-        # Cerrar cliente si existe
-        if cliente_publicador:
-            try:
-                # Pub/Sub client no necesita close explícito
-                pass
-            except Exception as e:
-                logger.warning(f"Error al finalizar cliente: {str(e)}")
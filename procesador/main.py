@@ -8,25 +8,60 @@ arquitectura medallion.
 Arquitectura: Pub/Sub Topic → Cloud Function (Procesador) → BigQuery + Cloud Storage
 """
 
-import base64
+import binascii
+import gzip
 import json
 import logging
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from functools import lru_cache
+from typing import Dict, Any, Optional, Sequence, Tuple
 
 import functions_framework
+import google.auth
+import msgpack
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
 from google.cloud import bigquery
-from google.cloud.exceptions import GoogleCloudError
+from google.cloud.exceptions import GoogleCloudError, PreconditionFailed
+from pydantic import BaseModel, ValidationError
+from requests.adapters import HTTPAdapter
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Configuración de logging estructurado
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
+class FormateadorJson(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON con severity y message.
+
+    Cloud Logging interpreta estas líneas como logs estructurados y agrega
+    la marca de tiempo, por lo que no se formatea asctime.
+    """
+
+    def format(self, registro: logging.LogRecord) -> str:
+        mensaje = registro.getMessage()
+        if registro.exc_info:
+            mensaje = f"{mensaje}\n{self.formatException(registro.exc_info)}"
+        return serializar_json(
+            {'severity': registro.levelname, 'message': mensaje}
+        ).decode('utf-8')
+
+
+# Configuración de logging estructurado: una línea JSON por registro en stdout
+# Nivel configurable con NIVEL_LOG (ej: WARNING en producción)
+_manejador_log = logging.StreamHandler(sys.stdout)
+_manejador_log.setFormatter(FormateadorJson())
 logger = logging.getLogger(__name__)
+logger.addHandler(_manejador_log)
+logger.setLevel(os.environ.get('NIVEL_LOG', 'INFO').upper())
+logger.propagate = False
 
 
 # Constantes de configuración
@@ -36,6 +71,131 @@ ID_PROYECTO = os.environ.get('GCP_PROJECT', os.environ.get('GOOGLE_CLOUD_PROJECT
 NOMBRE_BUCKET = os.environ.get('BUCKET_CLIMA', 'datos-clima-bronce')
 NOMBRE_DATASET = os.environ.get('DATASET_CLIMA', 'clima')
 NOMBRE_TABLA = os.environ.get('TABLA_CLIMA', 'condiciones_actuales')
+# Con 'false', la capa bronce queda a cargo de una suscripción de Pub/Sub
+# a Cloud Storage y la función solo escribe en BigQuery
+GUARDAR_BRONCE_GCS = os.environ.get('GUARDAR_BRONCE_GCS', 'true').lower() != 'false'
+# Mensajes que una instancia atiende en paralelo (debe coincidir con
+# --concurrency del despliegue); dimensiona hilos y pools de conexiones
+MENSAJES_CONCURRENTES = int(os.environ.get('MENSAJES_CONCURRENTES', '16'))
+NIVEL_COMPRESION_GZIP = 6  # balance entre CPU y tamaño del archivo bronce
+
+# Desde Python 3.11, datetime.fromisoformat acepta el sufijo 'Z' directamente
+_FROMISOFORMAT_ACEPTA_Z = sys.version_info >= (3, 11)
+
+# Columnas de BigQuery y su ruta dentro de la respuesta de Weather API,
+# en el orden del esquema. Se define una vez para no reconstruir las rutas
+# en cada mensaje.
+_RUTAS_CAMPOS = (
+    ('zona_horaria', ('timeZone', 'id')),
+
+    # Temperatura y métricas relacionadas - Weather API usa 'degrees'
+    ('temperatura', ('temperature', 'degrees')),
+    ('sensacion_termica', ('feelsLikeTemperature', 'degrees')),
+    ('punto_rocio', ('dewPoint', 'degrees')),
+    ('indice_calor', ('heatIndex', 'degrees')),
+    ('sensacion_viento', ('windChill', 'degrees')),
+
+    # Condiciones climáticas - Weather API usa 'weatherCondition' (singular)
+    ('condicion_clima', ('weatherCondition', 'type')),
+    ('descripcion_clima', ('weatherCondition', 'description', 'text')),
+
+    # Precipitación - estructura anidada
+    ('probabilidad_precipitacion', ('precipitation', 'probability', 'percent')),
+    ('precipitacion_acumulada', ('precipitation', 'qpf', 'quantity')),
+
+    # Métricas atmosféricas y viento
+    ('presion_aire', ('airPressure', 'meanSeaLevelMillibars')),
+    ('velocidad_viento', ('wind', 'speed', 'value')),
+    ('direccion_viento', ('wind', 'direction', 'degrees')),
+
+    ('visibilidad', ('visibility', 'distance')),
+    ('humedad_relativa', ('relativeHumidity',)),
+    ('indice_uv', ('uvIndex',)),
+
+    # Nubes y tormentas - valores directos
+    ('probabilidad_tormenta', ('thunderstormProbability',)),
+    ('cobertura_nubes', ('cloudCover',)),
+
+    # Día/noche - Weather API usa 'isDaytime'
+    ('es_dia', ('isDaytime',)),
+)
+
+
+# Clientes de GCP compartidos entre invocaciones del mismo contenedor;
+# se crean de forma perezosa en el primer mensaje (ver obtener_cliente_*)
+_cliente_storage = None
+_cliente_bigquery = None
+_candado_clientes = threading.Lock()
+
+# Pool de hilos compartido para escribir en GCS y BigQuery en paralelo,
+# sin crear hilos nuevos en cada invocación: dos escrituras por mensaje
+_ejecutor_escrituras = ThreadPoolExecutor(max_workers=2 * MENSAJES_CONCURRENTES)
+
+
+class Coordenadas(BaseModel):
+    """Coordenadas geográficas de la ubicación."""
+    latitud: float
+    longitud: float
+
+
+class EventoClima(BaseModel):
+    """
+    Esquema mínimo del mensaje publicado por el extractor.
+
+    El modelo se compila una vez al cargar el módulo; validar un mensaje
+    no recorre campos en Python. Los campos no declarados se ignoran.
+    """
+    nombre_ubicacion: str
+    coordenadas: Coordenadas
+    datos_clima_raw: Dict[str, Any]
+    marca_tiempo_extraccion: str
+
+
+@dataclass(slots=True)
+class FilaBigQuery:
+    """Fila de la tabla de condiciones actuales (capa plata), en el orden del esquema."""
+    nombre_ubicacion: Optional[str] = None
+    latitud: Optional[float] = None
+    longitud: Optional[float] = None
+    hora_actual: Optional[str] = None
+    zona_horaria: Optional[str] = None
+    temperatura: Optional[float] = None
+    sensacion_termica: Optional[float] = None
+    punto_rocio: Optional[float] = None
+    indice_calor: Optional[float] = None
+    sensacion_viento: Optional[float] = None
+    condicion_clima: Optional[str] = None
+    descripcion_clima: Optional[str] = None
+    probabilidad_precipitacion: Optional[float] = None
+    precipitacion_acumulada: Optional[float] = None
+    presion_aire: Optional[float] = None
+    velocidad_viento: Optional[float] = None
+    direccion_viento: Optional[float] = None
+    visibilidad: Optional[float] = None
+    humedad_relativa: Optional[float] = None
+    indice_uv: Optional[float] = None
+    probabilidad_tormenta: Optional[float] = None
+    cobertura_nubes: Optional[float] = None
+    es_dia: Optional[bool] = None
+    marca_tiempo_ingestion: Optional[str] = None
+    uri_datos_crudos: Optional[str] = None
+    datos_json_crudo: Optional[str] = None
+
+    def a_fila_json(self) -> Dict[str, Any]:
+        """
+        Convierte la fila al diccionario que espera insert_rows_json.
+
+        A diferencia de dataclasses.asdict, no copia recursivamente los valores:
+        todos son escalares.
+
+        Returns:
+            dict: Fila con una clave por columna
+        """
+        return {campo: getattr(self, campo) for campo in _CAMPOS_FILA_BIGQUERY}
+
+
+# Nombres de columna de FilaBigQuery, calculados una sola vez
+_CAMPOS_FILA_BIGQUERY = tuple(campo.name for campo in fields(FilaBigQuery))
 
 
 class ErrorProcesamientoClima(Exception):
@@ -58,10 +218,141 @@ class ErrorValidacionDatos(Exception):
     pass
 
 
+def serializar_json(datos: Any) -> bytes:
+    """
+    Serializa datos a JSON codificado en UTF-8.
+
+    Args:
+        datos: Datos a serializar
+
+    Returns:
+        bytes: JSON en UTF-8 (sin escapar caracteres no ASCII)
+    """
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False).encode('utf-8')
+
+
+def serializar_documento_bronce(datos: Dict[str, Any], crudo_json: bytes) -> bytes:
+    """
+    Serializa el mensaje completo para la capa bronce.
+
+    Con orjson, el JSON de datos_clima_raw ya generado se inserta tal cual
+    en el documento en lugar de volver a serializarlo.
+
+    Args:
+        datos: Datos del mensaje
+        crudo_json: datos_clima_raw ya serializado con serializar_json
+
+    Returns:
+        bytes: Documento JSON en UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps({**datos, 'datos_clima_raw': orjson.Fragment(crudo_json)})
+    return serializar_json(datos)
+
+
+def deserializar_json(contenido: bytes) -> Any:
+    """
+    Deserializa un documento JSON recibido como bytes.
+
+    Args:
+        contenido: JSON en bytes
+
+    Returns:
+        Any: Estructura de datos decodificada
+    """
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+def crear_sesion_http(alcances: Sequence[str]) -> Tuple[AuthorizedSession, Any, Optional[str]]:
+    """
+    Crea una sesión HTTP autorizada con pool de conexiones keep-alive.
+
+    El pool se dimensiona según MENSAJES_CONCURRENTES para que los mensajes
+    atendidos en paralelo no abran conexiones fuera del pool.
+
+    Args:
+        alcances: Scopes OAuth requeridos por el cliente
+
+    Returns:
+        Tuple: Sesión autorizada, credenciales y proyecto por defecto
+    """
+    credenciales, proyecto = google.auth.default(scopes=alcances)
+    sesion_http = AuthorizedSession(credenciales)
+    sesion_http.mount(
+        'https://',
+        HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=max(10, MENSAJES_CONCURRENTES),
+            pool_block=False
+        )
+    )
+    return sesion_http, credenciales, proyecto
+
+
+def obtener_cliente_storage() -> storage.Client:
+    """
+    Obtiene el cliente de Cloud Storage, creándolo en el primer uso.
+
+    El cliente se conserva a nivel de módulo para reutilizar conexiones
+    y credenciales en las invocaciones siguientes del mismo contenedor.
+    El candado evita crear dos clientes cuando llegan mensajes en paralelo
+    a una instancia nueva.
+
+    Returns:
+        storage.Client: Cliente de Cloud Storage compartido
+    """
+    global _cliente_storage
+    if _cliente_storage is None:
+        with _candado_clientes:
+            if _cliente_storage is None:
+                sesion_http, credenciales, proyecto = crear_sesion_http(
+                    storage.Client.SCOPE
+                )
+                _cliente_storage = storage.Client(
+                    project=proyecto,
+                    credentials=credenciales,
+                    _http=sesion_http
+                )
+    return _cliente_storage
+
+
+def obtener_cliente_bigquery() -> bigquery.Client:
+    """
+    Obtiene el cliente de BigQuery, creándolo en el primer uso.
+
+    El cliente se conserva a nivel de módulo para reutilizar conexiones
+    y credenciales en las invocaciones siguientes del mismo contenedor.
+
+    Returns:
+        bigquery.Client: Cliente de BigQuery compartido
+    """
+    global _cliente_bigquery
+    if _cliente_bigquery is None:
+        with _candado_clientes:
+            if _cliente_bigquery is None:
+                sesion_http, credenciales, proyecto = crear_sesion_http(
+                    bigquery.Client.SCOPE
+                )
+                _cliente_bigquery = bigquery.Client(
+                    project=proyecto,
+                    credentials=credenciales,
+                    _http=sesion_http
+                )
+    return _cliente_bigquery
+
+
 def decodificar_mensaje_pubsub(mensaje_pubsub: Dict[str, Any]) -> Dict[str, Any]:
     """
     Decodifica el mensaje de Pub/Sub y extrae los datos.
 
+    El formato del payload se elige según el atributo content_type:
+    MessagePack para 'application/msgpack' y JSON en cualquier otro caso
+    (incluidos mensajes antiguos sin el atributo).
+
     Args:
         mensaje_pubsub: Mensaje recibido de Pub/Sub
 
@@ -77,13 +368,21 @@ def decodificar_mensaje_pubsub(mensaje_pubsub: Dict[str, Any]) -> Dict[str, Any]
         if not datos_codificados:
             raise ErrorValidacionDatos("Mensaje Pub/Sub sin datos")
 
-        # Decodificar de base64
-        datos_json = base64.b64decode(datos_codificados).decode('utf-8')
+        # Decodificar de base64 directo a bytes: a2b_base64 acepta el str
+        # ASCII sin la conversión intermedia que hace base64.b64decode
+        contenido = binascii.a2b_base64(datos_codificados)
 
-        # Parsear JSON
-        datos = json.loads(datos_json)
+        # Deserializar según el tipo de contenido publicado por el extractor
+        atributos = mensaje_pubsub.get('attributes') or {}
+        if atributos.get('content_type') == 'application/msgpack':
+            datos = msgpack.unpackb(contenido, raw=False)
+        else:
+            datos = deserializar_json(contenido)
 
-        logger.info(f"Mensaje decodificado exitosamente para ubicación: {datos.get('nombre_ubicacion', 'desconocida')}")
+        logger.info(
+            "Mensaje decodificado exitosamente para ubicación: %s",
+            datos.get('nombre_ubicacion', 'desconocida')
+        )
 
         return datos
 
@@ -108,31 +407,64 @@ def validar_datos_clima(datos: Dict[str, Any]) -> None:
     Raises:
         ErrorValidacionDatos: Si los datos no tienen la estructura correcta
     """
-    campos_requeridos = [
-        'nombre_ubicacion',
-        'coordenadas',
-        'datos_clima_raw',
-        'marca_tiempo_extraccion'
-    ]
-
-    for campo in campos_requeridos:
-        if campo not in datos:
+    try:
+        EventoClima.model_validate(datos)
+    except ValidationError as e:
+        # Informar el primer problema encontrado, con la ruta del campo
+        error = e.errors()[0]
+        campo = '.'.join(str(parte) for parte in error['loc']) or 'mensaje'
+        if error['type'] == 'missing':
             raise ErrorValidacionDatos(f"Campo requerido faltante: {campo}")
-
-    # Validar coordenadas
-    coordenadas = datos.get('coordenadas', {})
-    if 'latitud' not in coordenadas or 'longitud' not in coordenadas:
-        raise ErrorValidacionDatos("Coordenadas incompletas")
+        raise ErrorValidacionDatos(f"Campo inválido {campo}: {error['msg']}")
 
     logger.info("Validación de datos completada exitosamente")
 
 
+def parsear_fecha_iso(texto: str) -> datetime:
+    """
+    Parsea una fecha ISO 8601, incluido el sufijo 'Z' de UTC.
+
+    Args:
+        texto: Fecha en formato ISO 8601
+
+    Returns:
+        datetime: Fecha parseada
+
+    Raises:
+        ValueError: Si el texto no es una fecha ISO 8601 válida
+    """
+    if not _FROMISOFORMAT_ACEPTA_Z and texto.endswith('Z'):
+        texto = texto[:-1] + '+00:00'
+    return datetime.fromisoformat(texto)
+
+
+@lru_cache(maxsize=128)
+def normalizar_nombre_ruta(nombre_ubicacion: str) -> str:
+    """
+    Normaliza el nombre de una ubicación para usarlo como prefijo en GCS.
+
+    El conjunto de ubicaciones es pequeño y fijo, así que el resultado se
+    memoriza y cada mensaje solo paga una búsqueda en la caché.
+
+    Args:
+        nombre_ubicacion: Nombre de la ubicación
+
+    Returns:
+        str: Nombre en minúsculas con espacios reemplazados por '_'
+    """
+    return nombre_ubicacion.lower().replace(' ', '_')
+
+
 def construir_ruta_gcs(datos: Dict[str, Any]) -> str:
     """
     Construye la ruta de almacenamiento en GCS siguiendo estructura de particiones.
 
     Formato: {ubicacion}/{AAAA}/{MM}/{DD}/{timestamp}.json
 
+    La marca de tiempo ISO 8601 tiene formato fijo (AAAA-MM-DDTHH:MM:SS...),
+    por lo que sus componentes se toman por posición sin parsear un datetime.
+    Como antes, se usan la fecha y hora tal como vienen, sin convertir zona.
+
     Args:
         datos: Datos climáticos procesados
 
@@ -140,19 +472,20 @@ def construir_ruta_gcs(datos: Dict[str, Any]) -> str:
         str: Ruta del archivo en GCS
     """
     try:
-        nombre_ubicacion = datos['nombre_ubicacion'].lower().replace(' ', '_')
-        marca_tiempo = datetime.fromisoformat(datos['marca_tiempo_extraccion'].replace('Z', '+00:00'))
+        nombre_ubicacion = normalizar_nombre_ruta(datos['nombre_ubicacion'])
+        marca_tiempo = datos['marca_tiempo_extraccion']
+
+        # Componentes por posición: AAAA-MM-DDTHH:MM:SS
+        anio, mes, dia = marca_tiempo[0:4], marca_tiempo[5:7], marca_tiempo[8:10]
+        hora = marca_tiempo[11:13] + marca_tiempo[14:16] + marca_tiempo[17:19]
+        digitos = anio + mes + dia + hora
+        if len(digitos) != 14 or not (digitos.isascii() and digitos.isdigit()):
+            raise ValueError(f"Marca de tiempo con formato inesperado: {marca_tiempo}")
 
         # Construir ruta particionada
-        ruta = (
-            f"{nombre_ubicacion}/"
-            f"{marca_tiempo.year:04d}/"
-            f"{marca_tiempo.month:02d}/"
-            f"{marca_tiempo.day:02d}/"
-            f"{marca_tiempo.strftime('%Y%m%d_%H%M%S')}.json"
-        )
+        ruta = f"{nombre_ubicacion}/{anio}/{mes}/{dia}/{anio}{mes}{dia}_{hora}.json"
 
-        logger.info(f"Ruta GCS construida: {ruta}")
+        logger.info("Ruta GCS construida: %s", ruta)
         return ruta
 
     except Exception as e:
@@ -164,7 +497,9 @@ def construir_ruta_gcs(datos: Dict[str, Any]) -> str:
 def guardar_en_gcs(
     cliente_storage: storage.Client,
     nombre_bucket: str,
-    datos: Dict[str, Any]
+    ruta_archivo: str,
+    datos: Dict[str, Any],
+    crudo_json: bytes
 ) -> str:
     """
     Guarda los datos crudos en Cloud Storage (capa bronce - medallion architecture).
@@ -172,7 +507,9 @@ def guardar_en_gcs(
     Args:
         cliente_storage: Cliente de Cloud Storage
         nombre_bucket: Nombre del bucket de destino
+        ruta_archivo: Ruta del archivo en el bucket (ver construir_ruta_gcs)
         datos: Datos a almacenar
+        crudo_json: datos_clima_raw ya serializado a JSON
 
     Returns:
         str: URI completa del archivo guardado (gs://bucket/ruta)
@@ -182,11 +519,10 @@ def guardar_en_gcs(
     """
     try:
         bucket = cliente_storage.bucket(nombre_bucket)
-        ruta_archivo = construir_ruta_gcs(datos)
         blob = bucket.blob(ruta_archivo)
 
-        # Convertir a JSON con formato legible
-        datos_json = json.dumps(datos, ensure_ascii=False, indent=2)
+        # Convertir a JSON compacto (bytes UTF-8) reutilizando los datos crudos
+        datos_json = serializar_documento_bronce(datos, crudo_json)
 
         # Guardar con metadata
         blob.metadata = {
@@ -196,14 +532,23 @@ def guardar_en_gcs(
             'version_procesador': '1.0.0'
         }
 
-        # Subir archivo
-        blob.upload_from_string(
-            datos_json,
-            content_type='application/json'
-        )
-
+        # Subir archivo comprimido; GCS lo entrega descomprimido a los
+        # clientes que no aceptan gzip (transcodificación descompresiva).
+        # if_generation_match=0 solo crea el objeto si no existe, de modo que
+        # un reintento del mismo mensaje no sobrescribe ni genera otra versión.
         uri_completa = f"gs://{nombre_bucket}/{ruta_archivo}"
-        logger.info(f"Datos guardados exitosamente en GCS: {uri_completa}")
+        blob.content_encoding = 'gzip'
+        try:
+            blob.upload_from_string(
+                gzip.compress(datos_json, compresslevel=NIVEL_COMPRESION_GZIP),
+                content_type='application/json',
+                if_generation_match=0
+            )
+        except PreconditionFailed:
+            logger.info("Archivo ya existente en GCS (reintento): %s", uri_completa)
+            return uri_completa
+
+        logger.info("Datos guardados exitosamente en GCS: %s", uri_completa)
 
         return uri_completa
 
@@ -218,37 +563,44 @@ def guardar_en_gcs(
         raise ErrorAlmacenamientoGCS(mensaje_error)
 
 
-def extraer_valor_seguro(datos: Dict[str, Any], ruta: List[str], predeterminado: Any = None) -> Any:
+def extraer_valor_seguro(datos: Dict[str, Any], ruta: Sequence[str], predeterminado: Any = None) -> Any:
     """
     Extrae un valor de un diccionario anidado de forma segura.
 
     Args:
         datos: Diccionario de datos
-        ruta: Lista con la ruta de claves a seguir
+        ruta: Secuencia con la ruta de claves a seguir
         predeterminado: Valor predeterminado si no se encuentra
 
     Returns:
         Any: Valor encontrado o predeterminado
     """
+    # Las respuestas de Weather API son estables: el acceso directo es el caso
+    # habitual y una clave faltante o un nivel que no es dict es la excepción
     actual = datos
-    for clave in ruta:
-        if isinstance(actual, dict) and clave in actual:
+    try:
+        for clave in ruta:
             actual = actual[clave]
-        else:
-            return predeterminado
+    except (KeyError, TypeError):
+        return predeterminado
     return actual
 
 
-def transformar_datos_para_bigquery(datos: Dict[str, Any], uri_gcs: str) -> Dict[str, Any]:
+def transformar_datos_para_bigquery(
+    datos: Dict[str, Any],
+    uri_gcs: Optional[str],
+    crudo_json: bytes
+) -> FilaBigQuery:
     """
     Transforma los datos crudos al esquema de BigQuery (capa plata - medallion architecture).
 
     Args:
         datos: Datos crudos del clima
-        uri_gcs: URI del archivo en GCS
+        uri_gcs: URI del archivo en GCS (None si la función no escribe la capa bronce)
+        crudo_json: datos_clima_raw ya serializado a JSON
 
     Returns:
-        dict: Datos transformados para BigQuery
+        FilaBigQuery: Datos transformados para BigQuery
 
     Raises:
         ErrorProcesamientoClima: Si falla la transformación
@@ -257,123 +609,33 @@ def transformar_datos_para_bigquery(datos: Dict[str, Any], uri_gcs: str) -> Dict
         datos_clima_raw = datos.get('datos_clima_raw', {})
         coordenadas = datos.get('coordenadas', {})
 
+        # Instante de ingestión, también usado como respaldo de la hora actual
+        ahora = datetime.now(timezone.utc)
+
         # Extraer fecha/hora - Weather API usa 'currentTime'
-        fecha_hora_str = extraer_valor_seguro(datos_clima_raw, ['currentTime'], '')
+        fecha_hora_str = extraer_valor_seguro(datos_clima_raw, ('currentTime',), '')
         try:
-            fecha_hora = datetime.fromisoformat(fecha_hora_str.replace('Z', '+00:00'))
+            fecha_hora = parsear_fecha_iso(fecha_hora_str)
         except Exception:
-            fecha_hora = datetime.now(timezone.utc)
-
-        # Extraer temperatura y métricas relacionadas - Weather API usa 'degrees'
-        temperatura_celsius = extraer_valor_seguro(
-            datos_clima_raw, ['temperature', 'degrees']
-        )
-        sensacion_termica = extraer_valor_seguro(
-            datos_clima_raw, ['feelsLikeTemperature', 'degrees']
-        )
-        punto_rocio = extraer_valor_seguro(
-            datos_clima_raw, ['dewPoint', 'degrees']
-        )
-        indice_calor = extraer_valor_seguro(
-            datos_clima_raw, ['heatIndex', 'degrees']
-        )
-        sensacion_viento = extraer_valor_seguro(
-            datos_clima_raw, ['windChill', 'degrees']
+            fecha_hora = ahora
+
+        # Construir fila para BigQuery: las columnas de Weather API salen
+        # de la tabla de rutas en una sola pasada
+        fila_bigquery = FilaBigQuery(
+            nombre_ubicacion=datos.get('nombre_ubicacion'),
+            latitud=coordenadas.get('latitud'),
+            longitud=coordenadas.get('longitud'),
+            hora_actual=fecha_hora.isoformat(),
+            marca_tiempo_ingestion=ahora.isoformat(),
+            uri_datos_crudos=uri_gcs,
+            datos_json_crudo=crudo_json.decode('utf-8'),
+            **{
+                columna: extraer_valor_seguro(datos_clima_raw, ruta)
+                for columna, ruta in _RUTAS_CAMPOS
+            }
         )
 
-        # Extraer condiciones climáticas - Weather API usa 'weatherCondition' (singular)
-        condicion_clima = extraer_valor_seguro(
-            datos_clima_raw, ['weatherCondition', 'type']
-        )
-        descripcion_clima = extraer_valor_seguro(
-            datos_clima_raw, ['weatherCondition', 'description', 'text']
-        )
-
-        # Extraer precipitación - Weather API usa estructura anidada
-        precipitacion = extraer_valor_seguro(
-            datos_clima_raw, ['precipitation', 'qpf', 'quantity']
-        )
-        probabilidad_precipitacion = extraer_valor_seguro(
-            datos_clima_raw, ['precipitation', 'probability', 'percent']
-        )
-
-        # Extraer métricas atmosféricas - Weather API estructura
-        presion_aire = extraer_valor_seguro(
-            datos_clima_raw, ['airPressure', 'meanSeaLevelMillibars']
-        )
-        humedad_relativa = extraer_valor_seguro(
-            datos_clima_raw, ['relativeHumidity']
-        )
-        visibilidad = extraer_valor_seguro(
-            datos_clima_raw, ['visibility', 'distance']
-        )
-
-        # Extraer viento - Weather API usa estructura anidada
-        velocidad_viento = extraer_valor_seguro(
-            datos_clima_raw, ['wind', 'speed', 'value']
-        )
-        direccion_viento = extraer_valor_seguro(
-            datos_clima_raw, ['wind', 'direction', 'degrees']
-        )
-
-        # Extraer índice UV - Weather API valor directo
-        indice_uv = extraer_valor_seguro(
-            datos_clima_raw, ['uvIndex']
-        )
-
-        # Extraer nubes y tormentas - Weather API valores directos
-        cobertura_nubes = extraer_valor_seguro(
-            datos_clima_raw, ['cloudCover']
-        )
-        probabilidad_tormenta = extraer_valor_seguro(
-            datos_clima_raw, ['thunderstormProbability']
-        )
-
-        # Determinar si es de día - Weather API usa 'isDaytime'
-        es_dia = extraer_valor_seguro(
-            datos_clima_raw, ['isDaytime']
-        )
-
-        # Construir fila para BigQuery
-        fila_bigquery = {
-            'nombre_ubicacion': datos.get('nombre_ubicacion'),
-            'latitud': coordenadas.get('latitud'),
-            'longitud': coordenadas.get('longitud'),
-
-            'hora_actual': fecha_hora.isoformat(),
-            'zona_horaria': extraer_valor_seguro(datos_clima_raw, ['timeZone', 'id']),
-
-            'temperatura': temperatura_celsius,
-            'sensacion_termica': sensacion_termica,
-            'punto_rocio': punto_rocio,
-            'indice_calor': indice_calor,
-            'sensacion_viento': sensacion_viento,
-
-            'condicion_clima': condicion_clima,
-            'descripcion_clima': descripcion_clima,
-
-            'probabilidad_precipitacion': probabilidad_precipitacion,
-            'precipitacion_acumulada': precipitacion,
-
-            'presion_aire': presion_aire,
-            'velocidad_viento': velocidad_viento,
-            'direccion_viento': direccion_viento,
-
-            'visibilidad': visibilidad,
-            'humedad_relativa': humedad_relativa,
-            'indice_uv': indice_uv,
-
-            'probabilidad_tormenta': probabilidad_tormenta,
-            'cobertura_nubes': cobertura_nubes,
-
-            'es_dia': es_dia,
-
-            'marca_tiempo_ingestion': datetime.now(timezone.utc).isoformat(),
-            'uri_datos_crudos': uri_gcs,
-            'datos_json_crudo': json.dumps(datos_clima_raw, ensure_ascii=False)
-        }
-
-        logger.info(f"Datos transformados exitosamente para {datos.get('nombre_ubicacion')}")
+        logger.info("Datos transformados exitosamente para %s", datos.get('nombre_ubicacion'))
 
         return fila_bigquery
 
@@ -387,16 +649,21 @@ def guardar_en_bigquery(
     cliente_bigquery: bigquery.Client,
     nombre_dataset: str,
     nombre_tabla: str,
-    fila: Dict[str, Any]
+    fila: Dict[str, Any],
+    id_fila: Optional[str] = None
 ) -> None:
     """
     Guarda los datos transformados en BigQuery (capa plata - medallion architecture).
 
+    Si se entrega id_fila (el messageId de Pub/Sub), se envía como insertId
+    para que BigQuery descarte la fila de reentregas duplicadas.
+
     Args:
         cliente_bigquery: Cliente de BigQuery
         nombre_dataset: Nombre del dataset
         nombre_tabla: Nombre de la tabla
         fila: Fila de datos a insertar
+        id_fila: ID de deduplicación de la fila (opcional)
 
     Raises:
         ErrorAlmacenamientoBigQuery: Si falla la inserción
@@ -405,7 +672,11 @@ def guardar_en_bigquery(
         tabla_id = f"{ID_PROYECTO}.{nombre_dataset}.{nombre_tabla}"
 
         # Insertar fila
-        errores = cliente_bigquery.insert_rows_json(tabla_id, [fila])
+        errores = cliente_bigquery.insert_rows_json(
+            tabla_id,
+            [fila],
+            row_ids=[id_fila] if id_fila else None
+        )
 
         if errores:
             mensaje_error = f"Errores al insertar en BigQuery: {errores}"
@@ -413,8 +684,8 @@ def guardar_en_bigquery(
             raise ErrorAlmacenamientoBigQuery(mensaje_error)
 
         logger.info(
-            f"Datos insertados exitosamente en BigQuery: "
-            f"{nombre_dataset}.{nombre_tabla} para {fila.get('nombre_ubicacion')}"
+            "Datos insertados exitosamente en BigQuery: %s.%s para %s",
+            nombre_dataset, nombre_tabla, fila.get('nombre_ubicacion')
         )
 
     except ErrorAlmacenamientoBigQuery:
@@ -438,9 +709,10 @@ def procesar_clima(evento_nube):
 
     Esta función es disparada por mensajes en el topic 'clima-datos-crudos' y:
     1. Decodifica y valida el mensaje de Pub/Sub
-    2. Guarda datos crudos en Cloud Storage (capa bronce)
-    3. Transforma datos al esquema de BigQuery
-    4. Inserta datos en BigQuery (capa plata)
+    2. Transforma datos al esquema de BigQuery
+    3. Guarda en paralelo los datos crudos en Cloud Storage (capa bronce,
+       salvo GUARDAR_BRONCE_GCS=false) y los datos transformados en
+       BigQuery (capa plata)
 
     Args:
         evento_nube: Evento de Cloud Functions con el mensaje de Pub/Sub
@@ -455,87 +727,97 @@ def procesar_clima(evento_nube):
         - Bronce (GCS): Datos crudos sin transformar
         - Plata (BigQuery): Datos limpios y estructurados para análisis
     """
-    logger.info("=" * 60)
     logger.info("Iniciando procesamiento de mensaje Pub/Sub")
-    logger.info("=" * 60)
-
-    cliente_storage = None
-    cliente_bigquery = None
 
     try:
-        # Extraer datos del evento
-        mensaje_pubsub = evento_nube.data
+        # Extraer el mensaje de Pub/Sub del evento una sola vez
+        mensaje_pubsub = evento_nube.data.get('message') or {}
+
+        # El messageId identifica las reentregas del mismo mensaje
+        id_mensaje = mensaje_pubsub.get('messageId') or mensaje_pubsub.get('message_id')
 
         # Obtener atributos del mensaje
-        atributos = mensaje_pubsub.get('message', {}).get('attributes', {})
+        atributos = mensaje_pubsub.get('attributes') or {}
         ubicacion_msg = atributos.get('ubicacion', 'desconocida')
 
-        logger.info(f"Procesando mensaje para ubicación: {ubicacion_msg}")
+        logger.info("Procesando mensaje para ubicación: %s", ubicacion_msg)
 
         # Decodificar mensaje
-        datos = decodificar_mensaje_pubsub(mensaje_pubsub.get('message', {}))
+        datos = decodificar_mensaje_pubsub(mensaje_pubsub)
 
         # Validar datos
         validar_datos_clima(datos)
 
         nombre_ubicacion = datos.get('nombre_ubicacion', 'desconocida')
 
-        # Crear clientes de GCP
-        cliente_storage = storage.Client()
-        cliente_bigquery = bigquery.Client()
+        # Clientes de GCP reutilizados entre invocaciones
+        cliente_storage = obtener_cliente_storage() if GUARDAR_BRONCE_GCS else None
+        cliente_bigquery = obtener_cliente_bigquery()
 
-        # PASO 1: Guardar datos crudos en Cloud Storage (capa bronce)
-        logger.info(f"Guardando datos crudos en GCS para {nombre_ubicacion}...")
-        uri_gcs = guardar_en_gcs(cliente_storage, NOMBRE_BUCKET, datos)
+        # PASO 1: Calcular la ruta en GCS; BigQuery solo necesita la URI,
+        # no que el archivo ya esté subido
+        if GUARDAR_BRONCE_GCS:
+            ruta_archivo = construir_ruta_gcs(datos)
+            uri_gcs = f"gs://{NOMBRE_BUCKET}/{ruta_archivo}"
+        else:
+            ruta_archivo = None
+            uri_gcs = None
+
+        # Serializar una sola vez los datos crudos, compartidos por GCS y BigQuery
+        crudo_json = serializar_json(datos.get('datos_clima_raw', {}))
 
         # PASO 2: Transformar datos para BigQuery
-        logger.info(f"Transformando datos para BigQuery: {nombre_ubicacion}...")
-        fila_bigquery = transformar_datos_para_bigquery(datos, uri_gcs)
-
-        # PASO 3: Guardar en BigQuery (capa plata)
-        logger.info(f"Guardando datos transformados en BigQuery: {nombre_ubicacion}...")
-        guardar_en_bigquery(
-            cliente_bigquery,
-            NOMBRE_DATASET,
-            NOMBRE_TABLA,
-            fila_bigquery
-        )
+        logger.info("Transformando datos para BigQuery: %s...", nombre_ubicacion)
+        fila_bigquery = transformar_datos_para_bigquery(datos, uri_gcs, crudo_json)
+
+        # PASO 3: Guardar datos transformados en BigQuery (capa plata) y,
+        # en paralelo, datos crudos en Cloud Storage (capa bronce)
+        logger.info("Guardando datos para %s...", nombre_ubicacion)
+        futuros = [
+            _ejecutor_escrituras.submit(
+                guardar_en_bigquery,
+                cliente_bigquery,
+                NOMBRE_DATASET,
+                NOMBRE_TABLA,
+                fila_bigquery.a_fila_json(),
+                id_mensaje
+            )
+        ]
+        if GUARDAR_BRONCE_GCS:
+            futuros.append(_ejecutor_escrituras.submit(
+                guardar_en_gcs,
+                cliente_storage,
+                NOMBRE_BUCKET,
+                ruta_archivo,
+                datos,
+                crudo_json
+            ))
+
+        # Esperar ambas escrituras antes de propagar el primer error,
+        # para no dejar una en curso al terminar la invocación
+        wait(futuros)
+        for futuro in futuros:
+            futuro.result()
 
-        logger.info("=" * 60)
         logger.info(
-            f"Procesamiento completado exitosamente para {nombre_ubicacion}"
+            "Procesamiento completado exitosamente para %s (URI GCS: %s)",
+            nombre_ubicacion, uri_gcs
         )
-        logger.info(f"URI GCS: {uri_gcs}")
-        logger.info("=" * 60)
 
     except ErrorValidacionDatos as e:
-        logger.error(f"Error de validación: {str(e)}")
+        logger.error("Error de validación: %s", e)
         # No reintentar - mensaje inválido
         logger.warning("Mensaje descartado por validación fallida")
 
     except (ErrorAlmacenamientoGCS, ErrorAlmacenamientoBigQuery) as e:
-        logger.error(f"Error de almacenamiento: {str(e)}")
+        logger.error("Error de almacenamiento: %s", e)
         # Estos errores causan reintento automático por Pub/Sub
         raise
 
     except ErrorProcesamientoClima as e:
-        logger.error(f"Error de procesamiento: {str(e)}")
+        logger.error("Error de procesamiento: %s", e)
         raise
 
     except Exception as e:
-        logger.error(f"Error inesperado en procesamiento: {str(e)}", exc_info=True)
+        logger.error("Error inesperado en procesamiento: %s", e, exc_info=True)
         raise
-
-    finally:
-        # Cerrar clientes si existen
-        if cliente_storage:
-            try:
-                cliente_storage.close()
-            except Exception as e:
-                logger.warning(f"Error al cerrar cliente de Storage: {str(e)}")
-
-        if cliente_bigquery:
-            try:
-                cliente_bigquery.close()
-            except Exception as e:
-                logger.warning(f"Error al cerrar cliente de BigQuery: {str(e)}")